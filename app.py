@@ -40,6 +40,13 @@ else:
 import re
 import json
 import zipfile
+import uuid
+import gc
+import queue
+import threading
+import tracemalloc
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging 
 
@@ -62,6 +69,7 @@ import torch
 import numpy as np
 import librosa
 import soundfile as sf
+import psutil
 from pydub import AudioSegment
 
 # Force torchaudio to use soundfile backend to avoid torchcodec/ffmpeg issues on Windows
@@ -91,6 +99,34 @@ OUTPUT_FOLDER_NAME = "audio_output"
 OUTPUT_FOLDER = os.path.join(BASE_DIR, OUTPUT_FOLDER_NAME)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
+# Host-specific knobs written by autotune.py and applied when the app starts
+RUNTIME_PROFILE_PATH = os.path.join(BASE_DIR, "runtime_profile.json")
+
+def load_runtime_profile():
+    # None means "leave the library default"
+    profile = {"torch_threads": None, "interop_threads": None, "concurrency": 1}
+    if os.path.exists(RUNTIME_PROFILE_PATH):
+        try:
+            with open(RUNTIME_PROFILE_PATH, encoding="utf-8") as f: saved = json.load(f)
+            profile.update({k: v for k, v in saved.items() if k in profile})
+            logger.info(f"⚙️ Loaded runtime profile from {RUNTIME_PROFILE_PATH}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable runtime profile ({e}).")
+    return profile
+
+def save_runtime_profile(profile):
+    with open(RUNTIME_PROFILE_PATH, "w", encoding="utf-8") as f: json.dump(profile, f, indent=2)
+
+def apply_runtime_profile(profile):
+    # Each request gets torch_threads intra-op threads; concurrency x torch_threads should not exceed the core count
+    if profile["torch_threads"]: torch.set_num_threads(profile["torch_threads"])
+    if profile["interop_threads"]:
+        try: torch.set_num_interop_threads(profile["interop_threads"])
+        except RuntimeError as e: logger.warning(f"Could not set interop threads: {e}")
+    logger.info(f"⚙️ Runtime: {profile['concurrency']} concurrent request(s), {torch.get_num_threads()} torch threads each")
+
+runtime_profile = load_runtime_profile()
+
 MODELS = {
     "Sorani": "razhan/mms-tts-ckb",
     "Kurmanji (Arabic Script)": "facebook/mms-tts-kmr-script_arabic",
@@ -100,6 +136,17 @@ MODELS = {
 }
 
 HABIBI_DIALECTS = ["MSA", "SAU", "UAE", "ALG", "IRQ", "EGY", "MAR", "OMN", "TUN", "LEV", "SDN", "LBY"]
+HABIBI_DEFAULT_REF_TXT = "كان اللعيب حاضرًا في العديد من الأنشطة والفعاليات المرتبطة بكأس العالم."
+HABIBI_BATCH_SIZE = 2 # Chunks sampled together in one DiT call
+HABIBI_MAX_DURATION = 22 # Seconds of reference + generated audio the DiT handles well
+
+PIPELINE_QUEUE_SIZE = 4 # Items buffered between VITS pipeline stages
+PLAN_WINDOW_BATCHES = 4 # Batches' worth of phrases the planner may reorder by length
+
+KOKORO_MAX_CHARS = 300 # Alphabetic scripts: roughly one phoneme per character, well under Kokoro's 510
+KOKORO_CJK_MAX_CHARS = 100 # Japanese/Chinese: several phonemes per character and no spaces to cut at
+KOKORO_MAX_PHONEMES = 510
+KOKORO_G2P_LOOKAHEAD = 3 # Segments phonemized ahead of the one being synthesized
 
 KOKORO_LANGS = {
     "American English": "a",
@@ -147,6 +194,7 @@ TRANSLATIONS = {
         "export_mp3": "Export as MP3 (Smaller File)",
         "generate_btn": "🔊 Generate Speech",
         "audio_preview": "Audio Preview",
+        "live_preview": "Live Preview (Habibi)",
         "audio_file": "Audio File",
         "subtitles": "Subtitles (.srt)",
         "zip_bundle": "📦 ZIP Bundle",
@@ -192,6 +240,7 @@ TRANSLATIONS = {
         "export_mp3": "هەناردەکردن بە MP3",
         "generate_btn": "🔊 دروستکردنی دەنگ",
         "audio_preview": "گوێگرتن",
+        "live_preview": "گوێگرتنی ڕاستەوخۆ (حەبیبی)",
         "audio_file": "فایلی دەنگ",
         "subtitles": "ژێرنووس (.srt)",
         "zip_bundle": "📦 فایلی ZIP",
@@ -237,6 +286,7 @@ TRANSLATIONS = {
         "export_mp3": "تصدير بصيغة MP3",
         "generate_btn": "🔊 توليد الصوت",
         "audio_preview": "معاينة الصوت",
+        "live_preview": "معاينة مباشرة (حبيبي)",
         "audio_file": "ملف الصوت",
         "subtitles": "الترجمة (.srt)",
         "zip_bundle": "📦 حزمة ZIP",
@@ -268,6 +318,63 @@ LOCAL_OVERRIDE_DIR = os.path.join(BASE_DIR, "local_models")
 os.makedirs(LOCAL_OVERRIDE_DIR, exist_ok=True)
 
 model_cache = {}
+# Loaders check model_cache before and after taking this lock, so concurrent first requests load a model once
+model_load_lock = threading.RLock()
+
+# --- MEMORY INSTRUMENTATION ---
+# Set DOLPHIN_MEMORY_TRACE=1 (or let soak_test.py enable it) to log a snapshot after every engine stage of each request
+MEMORY_TRACE = os.environ.get("DOLPHIN_MEMORY_TRACE") == "1"
+memory_log = deque(maxlen=500)
+_MB = 1024 * 1024
+# numpy reports its buffers to tracemalloc, so tracing is what makes traced_mb cover audio arrays
+if MEMORY_TRACE: tracemalloc.start()
+
+def memory_snapshot():
+    """
+    Cheap per-stage reading in MB: RSS, the CUDA allocator (None on CPU) and the tracemalloc total,
+    which covers numpy array data because numpy reports to its own tracemalloc domain (None when not tracing).
+    """
+    return {
+        "rss_mb": psutil.Process().memory_info().rss / _MB,
+        "cuda_mb": torch.cuda.memory_allocated() / _MB if torch.cuda.is_available() else None,
+        "traced_mb": tracemalloc.get_traced_memory()[0] / _MB if tracemalloc.is_tracing() else None,
+    }
+
+def memory_census():
+    """
+    Expensive full count in MB: storages of every live CPU tensor, and numpy's own tracemalloc domain.
+    Walks the whole heap, so call it once per soak iteration rather than per stage.
+    """
+    storages = {}
+    for obj in gc.get_objects():
+        # type() instead of isinstance(): isinstance reads __class__, which warns on deprecated torch objects
+        if issubclass(type(obj), torch.Tensor) and obj.device.type == "cpu":
+            try:
+                st = obj.untyped_storage()
+                storages[st.data_ptr()] = st.nbytes()
+            except Exception: continue # Sparse and meta tensors have no plain storage
+    census = {"torch_mb": sum(storages.values()) / _MB, "numpy_mb": None}
+    if tracemalloc.is_tracing():
+        traces = tracemalloc.take_snapshot().filter_traces([tracemalloc.DomainFilter(True, np.lib.tracemalloc_domain)])
+        census["numpy_mb"] = sum(t.size for t in traces.traces) / _MB
+    return census
+
+def memory_checkpoint(record, stage):
+    if record is None: return
+    # Collect first so garbage still waiting for the cycle collector is not read as retained memory
+    gc.collect()
+    record["stages"].append((stage, memory_snapshot()))
+
+def memory_report(record):
+    """Keeps a finished request's snapshots in memory_log and logs them as one line."""
+    memory_log.append(record)
+    parts = []
+    for stage, snap in record["stages"]:
+        part = f"{stage} RSS {snap['rss_mb']:.1f}"
+        if snap["cuda_mb"] is not None: part += f" / CUDA {snap['cuda_mb']:.1f}"
+        if snap["traced_mb"] is not None: part += f" / traced {snap['traced_mb']:.1f}"
+        parts.append(part)
+    logger.info(f"🧠 Memory ({record['dialect']}, MB): " + " → ".join(parts))
 
 # --- TEXT CLEANER ---
 def normalize_kurdish_text(text: str) -> str:
@@ -293,69 +400,373 @@ def auto_punctuate(text):
         text = text.rstrip() + '.'
     return text
 
-def split_into_chunks(text, max_chars=400):
-    text = re.sub(r'\s+', ' ', text.strip())
-    if len(text) <= max_chars: return [text]
-    parts = re.split(r'([.؟!]+)', text)
+def split_into_sentences(text):
+    parts = re.split(r'([.؟!?。！？]+)', text)
     sentences = []
     for i in range(0, len(parts)-1, 2):
         s = parts[i] + parts[i+1]
         if s.strip(): sentences.append(s.strip())
     if len(parts)%2==1 and parts[-1].strip(): sentences.append(parts[-1].strip())
+    return sentences
+
+def split_into_chunks(text, max_chars=400):
+    text = re.sub(r'\s+', ' ', text.strip())
+    if len(text) <= max_chars: return [text]
     chunks, current = [], ""
-    for s in sentences:
+    for s in split_into_sentences(text):
         if current and len(current) + len(s) + 1 > max_chars:
             chunks.append(current)
             current = s
-        else: current = current + " " + s if current else s
+        # CJK sentences are written without a space after the full stop
+        else: current = current + ("" if current[-1:] in "。！？" else " ") + s if current else s
     if current: chunks.append(current)
     return chunks
 
+def clause_cut(text, limit):
+    # Last clause mark (else space) before limit; text[:cut+1] is then a clean piece
+    cut = max(text.rfind(c, 0, limit) for c in ",;:،؛，、；：")
+    if cut <= 0: cut = text.rfind(" ", 0, limit)
+    if cut <= 0: cut = limit - 1
+    return cut
+
+def cut_long_chunks(chunks, max_chars):
+    # split_into_chunks never breaks a sentence; cut any that is still over max_chars at a clause or word boundary
+    pieces = []
+    for ch in chunks:
+        while len(ch) > max_chars:
+            cut = clause_cut(ch, max_chars)
+            pieces.append(ch[:cut+1].strip()); ch = ch[cut+1:].strip()
+        if ch: pieces.append(ch)
+    return pieces
+
+def kokoro_max_chars(lang_code):
+    return KOKORO_CJK_MAX_CHARS if lang_code in ('j', 'z') else KOKORO_MAX_CHARS
+
+def split_kokoro_segments(text, max_chars=KOKORO_MAX_CHARS):
+    # Paragraphs first, then sentences; a sentence longer than max_chars is cut at a clause or word boundary
+    segments = []
+    for para in re.split(r'\n+', text.strip()):
+        segments.extend(cut_long_chunks(split_into_chunks(para, max_chars), max_chars))
+    return segments
+
+def plan_synthesis(texts, batch_size, window_batches=PLAN_WINDOW_BATCHES, estimate=len):
+    """
+    Builds a synthesis plan: every phrase with its token-length estimate, in document order, plus
+    execution buckets of similar-length phrases so a batch doesn't wait on one long item.
+    Buckets only mix phrases from the same window, so results can be reassembled in order
+    with a bounded buffer. window_batches=1 keeps plain consecutive batches.
+    """
+    plan = [{"index": i, "text": t, "tokens": estimate(t)} for i, t in enumerate(texts)]
+    window = batch_size * window_batches
+    buckets = []
+    for start in range(0, len(plan), window):
+        ranked = sorted(plan[start:start+window], key=lambda p: p["tokens"])
+        group = [[p["index"] for p in ranked[j:j+batch_size]] for j in range(0, len(ranked), batch_size)]
+        # Run the bucket holding the earliest phrase first so the head of the document comes out first
+        buckets += sorted(group, key=min)
+    return plan, buckets
+
+def plan_padding(plan, buckets):
+    """Fraction of extra tokens computed because each bucket is padded to its longest phrase."""
+    useful = sum(p["tokens"] for p in plan)
+    padded = sum(max(plan[i]["tokens"] for i in b) * len(b) for b in buckets)
+    return (padded - useful) / useful if useful else 0.0
+
+# --- STAGE PIPELINE ---
+_STAGE_DONE = object()
+
+def run_stage_pipeline(items, stages, maxsize=PIPELINE_QUEUE_SIZE):
+    """
+    Runs items through stages, each on its own thread, with bounded queues in between.
+    Results are yielded in input order; a stage returning None drops the item.
+    The first exception raised by any stage is re-raised in the caller.
+    """
+    queues = [queue.Queue(maxsize) for _ in range(len(stages)+1)]
+    stop = threading.Event()
+    errors = []
+
+    def put(q, item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1); return True
+            except queue.Full: continue
+        return False
+
+    def get(q):
+        while True:
+            try: return q.get(timeout=0.1)
+            except queue.Empty:
+                if stop.is_set(): return _STAGE_DONE
+
+    def feed():
+        try:
+            for item in items:
+                if not put(queues[0], item): return
+        except Exception as e:
+            errors.append(e); stop.set()
+        finally:
+            put(queues[0], _STAGE_DONE)
+
+    def work(fn, q_in, q_out):
+        try:
+            while (item := get(q_in)) is not _STAGE_DONE:
+                result = fn(item)
+                if result is not None and not put(q_out, result): return
+        except Exception as e:
+            errors.append(e); stop.set()
+        finally:
+            put(q_out, _STAGE_DONE)
+
+    threads = [threading.Thread(target=feed, daemon=True)]
+    threads += [threading.Thread(target=work, args=(fn, queues[i], queues[i+1]), daemon=True) for i, fn in enumerate(stages)]
+    for t in threads: t.start()
+    try:
+        while (item := get(queues[-1])) is not _STAGE_DONE:
+            yield item
+    finally:
+        stop.set()
+        for t in threads: t.join()
+    if errors: raise errors[0]
+
 # --- AUDIO ENGINE ---
 def load_habibi_model(dialect="MSA"):
+    if "habibi" in model_cache: return model_cache["habibi"]
+    with model_load_lock:
+        if "habibi" in model_cache: return model_cache["habibi"]
+        try:
+            from f5_tts.infer.utils_infer import load_model as f5_load_model
+            from f5_tts.model import DiT
+            from cached_path import cached_path
+            
+            cfg = dict(dim=1024, depth=22, heads=16, ff_mult=2, text_dim=512, conv_layers=4)
+            
+            # We'll use the Unified model by default as it's the most flexible
+            ckpt_url = "hf://SWivid/Habibi-TTS/Unified/model_200000.safetensors"
+            vocab_url = "hf://SWivid/Habibi-TTS/Unified/vocab.txt"
+            
+            ckpt_path = str(cached_path(ckpt_url))
+            vocab_path = str(cached_path(vocab_url))
+            
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            model = f5_load_model(DiT, cfg, ckpt_path, vocab_file=vocab_path, device=device)
+            model_cache["habibi"] = (model, "habibi")
+            return model, "habibi"
+        except Exception as e:
+            logger.error(f"Habibi load failed: {e}")
+            return None, str(e)
+
+def load_habibi_vocoder():
+    if "habibi_vocoder" in model_cache: return model_cache["habibi_vocoder"]
+    with model_load_lock:
+        if "habibi_vocoder" in model_cache: return model_cache["habibi_vocoder"]
+        from f5_tts.infer.utils_infer import load_vocoder
+        vocoder = load_vocoder()
+        model_cache["habibi_vocoder"] = vocoder
+        return vocoder
+
+def resolve_habibi_reference(habibi_dialect="MSA", habibi_ref_wav=None, habibi_ref_txt=""):
+    if habibi_ref_wav: return habibi_ref_wav, habibi_ref_txt
+    # Use bundled asset as fallback
+    from importlib.resources import files
+    
+    # Check for MSA or specific dialect file
+    ref_file_name = f"{habibi_dialect}.mp3" if habibi_dialect != 'OMN' else "MSA.mp3"
+    
     try:
-        from f5_tts.infer.utils_infer import load_model as f5_load_model
-        from f5_tts.model import DiT
-        from cached_path import cached_path
-        
-        cfg = dict(dim=1024, depth=22, heads=16, ff_mult=2, text_dim=512, conv_layers=4)
+        # Try to locate the file in the package
+        pkg_path = files("habibi_tts").joinpath(f"assets/{ref_file_name}")
+        habibi_ref_wav = str(pkg_path)
         
-        # We'll use the Unified model by default as it's the most flexible
-        ckpt_url = "hf://SWivid/Habibi-TTS/Unified/model_200000.safetensors"
-        vocab_url = "hf://SWivid/Habibi-TTS/Unified/vocab.txt"
-        
-        ckpt_path = str(cached_path(ckpt_url))
-        vocab_path = str(cached_path(vocab_url))
-        
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        model = f5_load_model(DiT, cfg, ckpt_path, vocab_file=vocab_path, device=device)
-        return model, "habibi"
-    except Exception as e:
-        logger.error(f"Habibi load failed: {e}")
-        return None, str(e)
+        # Verify existence, fallback to MSA if missing
+        if not os.path.exists(habibi_ref_wav):
+            logger.warning(f"Dialect reference {habibi_ref_wav} not found. Fallback to MSA.")
+            habibi_ref_wav = str(files("habibi_tts").joinpath("assets/MSA.mp3"))
+            
+        if not os.path.exists(habibi_ref_wav):
+             # If even MSA is missing, use a safe default from the main repo or error gracefully
+             raise FileNotFoundError(f"Could not find any reference audio in {habibi_ref_wav}")
+
+    except Exception as ex:
+         logger.warning(f"Could not load bundled asset: {ex}. Please upload a reference audio.")
+         if not habibi_ref_wav: raise gr.Error("Please upload a reference audio file for voice cloning.")
+
+    if habibi_dialect == "MSA" or not habibi_ref_txt:
+        habibi_ref_txt = HABIBI_DEFAULT_REF_TXT
+    return habibi_ref_wav, habibi_ref_txt
+
+def prepare_habibi_reference(ref_file, ref_text):
+    """Loads the reference clip once per request; every chunk is conditioned on the same tensor."""
+    from habibi_tts.infer.utils_infer import target_sample_rate, target_rms, device
+    data, sr = sf.read(ref_file)
+    if data.ndim > 1: data = data.mean(axis=1)
+    rms = float(np.sqrt(np.mean(np.square(data))))
+    if rms < target_rms: data = data * target_rms / rms
+    if sr != target_sample_rate: data = librosa.resample(data, orig_sr=sr, target_sr=target_sample_rate)
+    if len(ref_text[-1].encode("utf-8")) == 1: ref_text = ref_text + " "
+    return torch.tensor(data).float().unsqueeze(0).to(device), ref_text, rms
+
+def habibi_chunk_chars(ref, speed):
+    # Same budget habibi's infer_process uses, counted in characters for split_into_chunks
+    from habibi_tts.infer.utils_infer import target_sample_rate
+    audio, ref_text, _ = ref
+    ref_s = audio.shape[-1] / target_sample_rate
+    return max(50, int(len(ref_text) / ref_s * (HABIBI_MAX_DURATION - ref_s) * speed))
+
+def habibi_sample_batch(model, ref, texts, speed, dialect_id):
+    from habibi_tts.infer.utils_infer import hop_length, nfe_step, cfg_strength, sway_sampling_coef
+    from habibi_tts.model.utils import text_list_formatter
+    audio, ref_text, _ = ref
+    ref_len = audio.shape[-1] // hop_length
+    ref_bytes = len(ref_text.encode("utf-8"))
+    durations = []
+    for t in texts:
+        t_bytes = len(t.encode("utf-8"))
+        local_speed = speed if t_bytes >= 10 else 0.3
+        durations.append(ref_len + int(ref_len / ref_bytes * t_bytes / local_speed))
+    text_list = text_list_formatter([ref_text + t for t in texts], dialect_id=dialect_id)
+    with torch.inference_mode():
+        generated, _ = model.sample(
+            cond=audio.repeat(len(texts), 1), text=text_list,
+            duration=torch.tensor(durations, device=audio.device),
+            steps=nfe_step, cfg_strength=cfg_strength, sway_sampling_coef=sway_sampling_coef
+        )
+    generated = generated.to(torch.float32)
+    # Each item is padded to the longest duration in the batch, so trim per item
+    return [generated[i:i+1, ref_len:d, :].permute(0, 2, 1) for i, d in enumerate(durations)]
+
+def habibi_vocode_batch(vocoder, mels, ref_rms):
+    from habibi_tts.infer.utils_infer import target_rms
+    waves = []
+    with torch.inference_mode():
+        for mel in mels:
+            wave = vocoder.decode(mel)
+            if ref_rms < target_rms: wave = wave * ref_rms / target_rms
+            waves.append(wave.squeeze().cpu().numpy())
+    return waves
+
+def stream_habibi_chunks(chunks, model, vocoder, ref, speed, dialect_id, batch_size=HABIBI_BATCH_SIZE, window_batches=PLAN_WINDOW_BATCHES):
+    """
+    Yields (chunk, wave) pairs in document order as soon as every earlier chunk is vocoded.
+    Chunks are batched by plan_synthesis (DiT duration grows with UTF-8 length, so that is the estimate).
+    The vocoder runs on a worker thread, so batch N is decoded while the DiT samples batch N+1.
+    """
+    _, buckets = plan_synthesis(chunks, batch_size, window_batches, estimate=lambda t: len(t.encode("utf-8")))
+    pending, ready, nxt = None, {}, 0
+    with ThreadPoolExecutor(max_workers=1) as vocoder_pool:
+        for bucket in buckets + [None]:
+            job = None
+            if bucket is not None:
+                mels = habibi_sample_batch(model, ref, [chunks[i] for i in bucket], speed, dialect_id)
+                job = (bucket, vocoder_pool.submit(habibi_vocode_batch, vocoder, mels, ref[2]))
+            if pending:
+                ready.update(zip(pending[0], pending[1].result()))
+                while nxt in ready:
+                    yield chunks[nxt], ready.pop(nxt); nxt += 1
+            pending = job
 
 def load_kokoro_model(lang_code='a'):
     key = f"kokoro_{lang_code}"
     if key in model_cache: return model_cache[key]
-    try:
-        from kokoro import KPipeline
-        logger.info(f"🚀 Loading Kokoro model for {lang_code}...")
-        
-        # Check local override
-        local_kokoro_path = os.path.join(LOCAL_OVERRIDE_DIR, "kokoro-82m")
-        if os.path.exists(os.path.join(local_kokoro_path, "config.json")):
-             print(f"Using manual local KOKORO model from: {local_kokoro_path}")
-             # KPipeline doesn't accept a path directly for the model usually, but we can bypass or let it use cache. 
-             # Actually KPipeline is strict. If manual override is needed, we rely on standard cache or advanced usage.
-             # For now, let's stick to standard loading for Kokoro unless advanced patch needed.
-             pass 
-
-        pipeline = KPipeline(lang_code=lang_code)
-        model_cache[key] = (pipeline, "kokoro")
-        return pipeline, "kokoro"
-    except Exception as e:
-        logger.error(f"Kokoro load failed: {e}")
-        return None, str(e)
+    with model_load_lock:
+        if key in model_cache: return model_cache[key]
+        try:
+            from kokoro import KPipeline
+            logger.info(f"🚀 Loading Kokoro model for {lang_code}...")
+            
+            # Check local override
+            local_kokoro_path = os.path.join(LOCAL_OVERRIDE_DIR, "kokoro-82m")
+            if os.path.exists(os.path.join(local_kokoro_path, "config.json")):
+                 print(f"Using manual local KOKORO model from: {local_kokoro_path}")
+                 # KPipeline doesn't accept a path directly for the model usually, but we can bypass or let it use cache. 
+                 # Actually KPipeline is strict. If manual override is needed, we rely on standard cache or advanced usage.
+                 # For now, let's stick to standard loading for Kokoro unless advanced patch needed.
+                 pass 
+
+            # All languages share one KModel; only the G2P frontend differs per language.
+            # No repo_id: that keyword only exists from kokoro 0.9, and requirements allow 0.7.
+            pipeline = KPipeline(lang_code=lang_code, model=model_cache.get("kokoro_model", True))
+            model_cache.setdefault("kokoro_model", pipeline.model)
+            model_cache[key] = (pipeline, "kokoro")
+            return pipeline, "kokoro"
+        except Exception as e:
+            logger.error(f"Kokoro load failed: {e}")
+            return None, str(e)
+
+def kokoro_phonemize(pipeline, segment):
+    """
+    Runs the pipeline's own G2P on one segment and returns [(graphemes, phonemes)] ready for inference.
+    Pieces whose phonemes exceed Kokoro's limit are split in two and phonemized again rather than truncated.
+    """
+    if pipeline.lang_code in 'ab':
+        _, tokens = pipeline.g2p(segment)
+        pieces = [(gs, ps) for gs, ps, _ in pipeline.en_tokenize(tokens) if ps]
+    else:
+        ps, _ = pipeline.g2p(segment)
+        pieces = [(segment, ps)] if ps else []
+    out = []
+    for gs, ps in pieces:
+        if len(ps) <= KOKORO_MAX_PHONEMES:
+            out.append((gs, ps)); continue
+        gs = gs.strip()
+        if len(gs) < 2:
+            logger.warning(f"Kokoro: '{gs}' alone exceeds {KOKORO_MAX_PHONEMES} phonemes, truncating.")
+            out.append((gs, ps[:KOKORO_MAX_PHONEMES])); continue
+        cut = clause_cut(gs, len(gs) // 2 + 1)
+        for half in (gs[:cut+1], gs[cut+1:]):
+            if half.strip(): out.extend(kokoro_phonemize(pipeline, half.strip()))
+    return out
+
+def stream_kokoro_segments(pipeline, segments, voice, speed, lookahead=KOKORO_G2P_LOOKAHEAD):
+    """
+    Yields (graphemes, audio) in order.
+    Phonemization of upcoming segments runs on a worker thread while the model synthesizes the current one.
+    """
+    pack = pipeline.load_voice(voice).to(pipeline.model.device)
+    with ThreadPoolExecutor(max_workers=1) as g2p_pool:
+        pending = deque(g2p_pool.submit(kokoro_phonemize, pipeline, seg) for seg in segments[:lookahead])
+        nxt = lookahead
+        while pending:
+            phonemized = pending.popleft().result()
+            if nxt < len(segments):
+                pending.append(g2p_pool.submit(kokoro_phonemize, pipeline, segments[nxt])); nxt += 1
+            for gs, ps in phonemized:
+                output = pipeline.infer(pipeline.model, ps, pack, speed)
+                yield gs, output.audio.numpy()
+
+def vits_frontend(chunks, p_s, p_l):
+    # Text frontend: turns chunks into ("speech", phrase) and ("silence", seconds) items in playback order.
+    # Each chunk ends with ("chunk_end", pause or None for the last one) so the engine can time cues per chunk.
+    for i, ch in enumerate(chunks):
+        for p in re.split(r'([.؟!:\n]+|\[p\]|\[s\])', ch):
+            p = p.strip()
+            if not p: continue
+            if p == "[p]": yield ("silence", p_l)
+            elif p == "[s]" or re.match(r'^[.؟!:\n]+$', p): yield ("silence", p_s)
+            elif len(p) < 2: continue
+            else: yield ("speech", p)
+        yield ("chunk_end", p_l if i < len(chunks)-1 else None)
+
+def vits_stages(model, tok, sr, speed, pitch):
+    """Returns the tokenizer, inference and DSP stages for run_stage_pipeline. Non-speech items pass straight through."""
+    def tokenize(item):
+        if item[0] != "speech": return item
+        ins = tok(item[1], return_tensors="pt")
+        if ins['input_ids'].shape[-1] == 0: return None
+        return ("speech", item[1], ins)
+
+    def infer(item):
+        if item[0] != "speech": return item
+        with torch.no_grad(): out = model(**item[2]).waveform
+        return ("speech", item[1], out)
+
+    def dsp(item):
+        if item[0] != "speech": return item
+        seg = item[2].float().numpy().T.flatten()
+        if speed != 1.0: seg = librosa.effects.time_stretch(seg, rate=speed)
+        if pitch != 0: seg = librosa.effects.pitch_shift(seg, sr=sr, n_steps=pitch)
+        return ("speech", item[1], seg)
+
+    return [tokenize, infer, dsp]
 
 def load_voice_model(dialect_name, kokoro_lang_code='a'):
     if dialect_name == "Arabic (Habibi - Dialectal)":
@@ -364,37 +775,39 @@ def load_voice_model(dialect_name, kokoro_lang_code='a'):
         return load_kokoro_model(kokoro_lang_code)
         
     if dialect_name in model_cache: return model_cache[dialect_name]
-    try:
-        logger.info(f"🚀 Loading model for {dialect_name}...")
-        
-        # 0. Check for MANUAL LOCAL OVERRIDE (For users who manually downloaded files)
-        # Sanitized folder name: "Sorani" -> "Sorani"
-        safe_name = "".join([c if c.isalnum() else "_" for c in dialect_name])
-        manual_path = os.path.join(LOCAL_OVERRIDE_DIR, safe_name)
-        
-        if os.path.exists(manual_path) and os.listdir(manual_path):
-             logger.info(f"📂 Found manual local model at: {manual_path}")
-             model = VitsModel.from_pretrained(manual_path, local_files_only=True)
-             tokenizer = AutoTokenizer.from_pretrained(manual_path, local_files_only=True)
-        else:
-            try:
-                # First attempt: Try loading from local cache ONLY (true offline)
-                model = VitsModel.from_pretrained(MODELS[dialect_name], cache_dir=MODEL_CACHE_DIR, local_files_only=True)
-                tokenizer = AutoTokenizer.from_pretrained(MODELS[dialect_name], cache_dir=MODEL_CACHE_DIR, local_files_only=True)
-            except Exception as offline_err:
-                # Second attempt: If not in cache, download it
-                logger.info(f"📡 Model not found in local cache or checking for updates... ({dialect_name})")
-                model = VitsModel.from_pretrained(MODELS[dialect_name], cache_dir=MODEL_CACHE_DIR, local_files_only=False)
-                tokenizer = AutoTokenizer.from_pretrained(MODELS[dialect_name], cache_dir=MODEL_CACHE_DIR, local_files_only=False)
+    with model_load_lock:
+        if dialect_name in model_cache: return model_cache[dialect_name]
+        try:
+            logger.info(f"🚀 Loading model for {dialect_name}...")
             
-        model_cache[dialect_name] = (model, tokenizer)
-        return model, tokenizer
-    except Exception as e:
-        error_msg = str(e)
-        if "incomplete metadata" in error_msg or "deserializing" in error_msg:
-            error_msg = "❌ Corrupted model file detected! Please delete the 'models_cache' folder and restart the app to redownload."
-        logger.error(f"Failed: {error_msg}")
-        return None, error_msg
+            # 0. Check for MANUAL LOCAL OVERRIDE (For users who manually downloaded files)
+            # Sanitized folder name: "Sorani" -> "Sorani"
+            safe_name = "".join([c if c.isalnum() else "_" for c in dialect_name])
+            manual_path = os.path.join(LOCAL_OVERRIDE_DIR, safe_name)
+            
+            if os.path.exists(manual_path) and os.listdir(manual_path):
+                 logger.info(f"📂 Found manual local model at: {manual_path}")
+                 model = VitsModel.from_pretrained(manual_path, local_files_only=True)
+                 tokenizer = AutoTokenizer.from_pretrained(manual_path, local_files_only=True)
+            else:
+                try:
+                    # First attempt: Try loading from local cache ONLY (true offline)
+                    model = VitsModel.from_pretrained(MODELS[dialect_name], cache_dir=MODEL_CACHE_DIR, local_files_only=True)
+                    tokenizer = AutoTokenizer.from_pretrained(MODELS[dialect_name], cache_dir=MODEL_CACHE_DIR, local_files_only=True)
+                except Exception as offline_err:
+                    # Second attempt: If not in cache, download it
+                    logger.info(f"📡 Model not found in local cache or checking for updates... ({dialect_name})")
+                    model = VitsModel.from_pretrained(MODELS[dialect_name], cache_dir=MODEL_CACHE_DIR, local_files_only=False)
+                    tokenizer = AutoTokenizer.from_pretrained(MODELS[dialect_name], cache_dir=MODEL_CACHE_DIR, local_files_only=False)
+                
+            model_cache[dialect_name] = (model, tokenizer)
+            return model, tokenizer
+        except Exception as e:
+            error_msg = str(e)
+            if "incomplete metadata" in error_msg or "deserializing" in error_msg:
+                error_msg = "❌ Corrupted model file detected! Please delete the 'models_cache' folder and restart the app to redownload."
+            logger.error(f"Failed: {error_msg}")
+            return None, error_msg
 
 def format_timestamp(s):
     ms = int((s % 1) * 1000)
@@ -403,79 +816,69 @@ def format_timestamp(s):
 
 def generate_audio_engine(text, dialect, speed, pitch, use_mp3, p_s, p_l, habibi_dialect="MSA", habibi_ref_wav=None, habibi_ref_txt="", kokoro_lang="a", kokoro_voice="af_bella"):
     if not text.strip(): raise gr.Error("Empty!")
+    mem = {"dialect": dialect, "stages": []} if MEMORY_TRACE else None
+    memory_checkpoint(mem, "start")
     text = normalize_kurdish_text(text)
     if not re.search(r'[.؟!,،]', text[:50]): text = auto_punctuate(text)
     
+    # Re-assert the per-request thread budget; Gradio may run this on a fresh worker thread
+    if runtime_profile["torch_threads"]: torch.set_num_threads(runtime_profile["torch_threads"])
+    
     # Map full language name to code for Kokoro
     if kokoro_lang in KOKORO_LANGS:
         kokoro_lang = KOKORO_LANGS[kokoro_lang]
 
     m_obj = load_voice_model(dialect, kokoro_lang)
     if not m_obj[0]: raise gr.Error(str(m_obj[1]))
+    memory_checkpoint(mem, "load_model")
     
     if m_obj[1] == "habibi":
         try:
-            from habibi_tts.infer.utils_infer import infer_process
-            from f5_tts.infer.utils_infer import load_vocoder, preprocess_ref_audio_text
+            from f5_tts.infer.utils_infer import preprocess_ref_audio_text
+            from habibi_tts.infer.utils_infer import target_sample_rate
             from habibi_tts.model.utils import dialect_id_map
             
             model = m_obj[0]
-            vocoder = load_vocoder()
-            
-            # Prepare reference audio
-            if not habibi_ref_wav:
-                # Use bundled asset as fallback
-                from importlib.resources import files
-                # Use bundled asset as fallback
-                from importlib.resources import files
-                
-                # Check for MSA or specific dialect file
-                ref_file_name = f"{habibi_dialect}.mp3" if habibi_dialect != 'OMN' else "MSA.mp3"
-                
-                try:
-                    # Try to locate the file in the package
-                    pkg_path = files("habibi_tts").joinpath(f"assets/{ref_file_name}")
-                    habibi_ref_wav = str(pkg_path)
-                    
-                    # Verify existence, fallback to MSA if missing
-                    if not os.path.exists(habibi_ref_wav):
-                        logger.warning(f"Dialect reference {habibi_ref_wav} not found. Fallback to MSA.")
-                        habibi_ref_wav = str(files("habibi_tts").joinpath("assets/MSA.mp3"))
-                        
-                    if not os.path.exists(habibi_ref_wav):
-                         # If even MSA is missing, use a safe default from the main repo or error gracefully
-                         raise FileNotFoundError(f"Could not find any reference audio in {habibi_ref_wav}")
-
-                except Exception as ex:
-                     logger.warning(f"Could not load bundled asset: {ex}. Please upload a reference audio.")
-                     if not habibi_ref_wav: raise gr.Error("Please upload a reference audio file for voice cloning.")
-
-                if habibi_dialect == "MSA" or not habibi_ref_txt:
-                    habibi_ref_txt = "كان اللعيب حاضرًا في العديد من الأنشطة والفعاليات المرتبطة بكأس العالم."
-            
+            vocoder = load_habibi_vocoder()
+            habibi_ref_wav, habibi_ref_txt = resolve_habibi_reference(habibi_dialect, habibi_ref_wav, habibi_ref_txt)
             logger.info(f"Using reference audio: {habibi_ref_wav}")
             
-            ref_audio, ref_text = preprocess_ref_audio_text(habibi_ref_wav, habibi_ref_txt)
+            ref = prepare_habibi_reference(*preprocess_ref_audio_text(habibi_ref_wav, habibi_ref_txt))
             dialect_id = dialect_id_map.get(habibi_dialect[:3], None)
+            sr = target_sample_rate
+            # A sentence over the budget (Arabic prose often runs on with only ،) would exceed HABIBI_MAX_DURATION
+            budget = habibi_chunk_chars(ref, speed)
+            chunks = cut_long_chunks(split_into_chunks(text, max_chars=budget), budget)
             
-            final_wave, sr, _ = infer_process(
-                ref_audio, ref_text, text, model, vocoder,
-                speed=speed, dialect_id=dialect_id
-            )
-            f_aud = final_wave
+            aud_segs, srt_segs, cur_t = [], [], 0.0
+            for i, (ch, seg) in enumerate(stream_habibi_chunks(chunks, model, vocoder, ref, speed, dialect_id)):
+                dur = len(seg)/sr
+                srt_segs.append(f"{len(srt_segs)+1}\n{format_timestamp(cur_t)} --> {format_timestamp(cur_t+dur)}\n{ch}\n\n")
+                # Chunks end at sentence boundaries, so they are joined with the sentence pause like VITS chunks
+                live = [seg]; cur_t += dur
+                if i < len(chunks)-1:
+                    live.append(np.zeros(int(sr*p_l))); cur_t += p_l
+                aud_segs.extend(live)
+                # Habibi output is already RMS-matched to the reference, so a fixed gain keeps live chunks at a steady level
+                yield None, None, None, None, (sr, (np.clip(np.concatenate(live), -1, 1) * 32767).astype(np.int16))
+            if not aud_segs: raise gr.Error("Habibi failed to generate audio.")
+            f_aud = np.concatenate(aud_segs)
+            srt_content = "".join(srt_segs)
         except Exception as e:
             raise gr.Error(f"Habibi Inference Error: {e}")
     elif m_obj[1] == "kokoro":
         try:
             pipeline = m_obj[0]
-            generator = pipeline(text, voice=kokoro_voice, speed=speed, split_pattern=r'\n+')
-            audio_list = []
-            for gs, ps, audio in generator:
-                audio_list.append(audio)
+            sr = 24000
+            audio_list, srt_segs, cur_t = [], [], 0.0
+            segments = split_kokoro_segments(text, kokoro_max_chars(kokoro_lang))
+            for gs, audio in stream_kokoro_segments(pipeline, segments, kokoro_voice, speed):
+                dur = len(audio)/sr
+                srt_segs.append(f"{len(srt_segs)+1}\n{format_timestamp(cur_t)} --> {format_timestamp(cur_t+dur)}\n{gs}\n\n")
+                audio_list.append(audio); cur_t += dur
             if not audio_list: raise gr.Error("Kokoro failed to generate audio.")
             f_aud = np.concatenate(audio_list)
-            sr = 24000
-            srt_content = f"1\n00:00:00,000 --> {format_timestamp(len(f_aud)/sr)}\n{text}\n"
+            srt_content = "".join(srt_segs)
         except Exception as e:
             raise gr.Error(f"Kokoro Inference Error: {e}")
     else:
@@ -484,44 +887,42 @@ def generate_audio_engine(text, dialect, speed, pitch, use_mp3, p_s, p_l, habibi
         chunks = split_into_chunks(text.strip())
         
         aud_segs, srt_segs, cur_t = [], [], 0.0
-        for i, ch in enumerate(chunks):
-            parts = re.split(r'([.؟!:\n]+|\[p\]|\[s\])', ch)
-            ch_aud, ch_t = [], 0.0
-            for p in parts:
-                p = p.strip()
-                if not p: continue
-                if p == "[p]": 
-                    ch_aud.append(np.zeros(int(sr*p_l))); ch_t+=p_l; continue
-                if p == "[s]" or re.match(r'^[.؟!:\n]+$', p):
-                    ch_aud.append(np.zeros(int(sr*p_s))); ch_t+=p_s; continue
-                if len(p) < 2: continue
-                ins = tok(p, return_tensors="pt")
-                if ins['input_ids'].shape[-1] == 0: continue
-                with torch.no_grad(): out = model(**ins).waveform
-                seg = out.float().numpy().T.flatten()
-                if speed != 1.0: seg = librosa.effects.time_stretch(seg, rate=speed)
-                if pitch != 0: seg = librosa.effects.pitch_shift(seg, sr=sr, n_steps=pitch)
-                dur = len(seg)/sr
-                srt_segs.append(f"{len(srt_segs)+1}\n{format_timestamp(cur_t+ch_t)} --> {format_timestamp(cur_t+ch_t+dur)}\n{p}\n\n")
-                ch_aud.append(seg); ch_aud.append(np.zeros(int(sr*0.1))); ch_t += dur+0.1
-            if ch_aud:
-                aud_segs.append(np.concatenate(ch_aud))
-                cur_t += ch_t
-                if i < len(chunks)-1:
-                    aud_segs.append(np.zeros(int(sr*p_l))); cur_t += p_l
+        ch_aud, ch_t = [], 0.0
+        stages = vits_stages(model, tok, sr, speed, pitch)
+        for item in run_stage_pipeline(vits_frontend(chunks, p_s, p_l), stages):
+            if item[0] == "chunk_end":
+                # Offsets accumulate per chunk (cur_t + ch_t), so cue times stay identical to unpipelined output
+                if ch_aud:
+                    aud_segs.extend(ch_aud); cur_t += ch_t
+                    if item[1] is not None: aud_segs.append(np.zeros(int(sr*item[1]))); cur_t += item[1]
+                ch_aud, ch_t = [], 0.0
+                continue
+            if item[0] == "silence":
+                ch_aud.append(np.zeros(int(sr*item[1]))); ch_t += item[1]; continue
+            _, p, seg = item
+            dur = len(seg)/sr
+            srt_segs.append(f"{len(srt_segs)+1}\n{format_timestamp(cur_t+ch_t)} --> {format_timestamp(cur_t+ch_t+dur)}\n{p}\n\n")
+            ch_aud.append(seg); ch_aud.append(np.zeros(int(sr*0.1))); ch_t += dur+0.1
         
-        if not aud_segs: return None, None, None, None
+        if not aud_segs:
+            yield None, None, None, None, None
+            return
         f_aud = np.concatenate(aud_segs)
         srt_content = "".join(srt_segs)
 
-    # Common normalization and output
-    f_aud = np.nan_to_num(f_aud)
-    mv = np.max(np.abs(f_aud))
-    if mv > 1e-6: f_aud = (f_aud / mv * 32767).astype(np.int16)
-    else: f_aud = f_aud.astype(np.int16)
+    memory_checkpoint(mem, "synthesis")
+
+    # Common normalization and output (in place, so long texts don't hold several full-length copies)
+    f_aud = np.nan_to_num(f_aud, copy=False)
+    mv = max(float(f_aud.max()), -float(f_aud.min()))
+    # Divide then scale, in that order, so samples match the out-of-place (f_aud / mv * 32767) bit for bit
+    if mv > 1e-6: f_aud /= mv; f_aud *= 32767
+    f_aud = f_aud.astype(np.int16)
+    memory_checkpoint(mem, "normalize")
     
+    # The uuid suffix keeps concurrent requests finishing in the same second from overwriting each other
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    w_p = os.path.join(OUTPUT_FOLDER, f"audio_{ts}.wav")
+    w_p = os.path.join(OUTPUT_FOLDER, f"audio_{ts}_{uuid.uuid4().hex[:8]}.wav")
     sf.write(w_p, f_aud, sr)
     f_p = w_p
     if use_mp3:
@@ -532,16 +933,15 @@ def generate_audio_engine(text, dialect, speed, pitch, use_mp3, p_s, p_l, habibi
         except: pass
     
     s_p = w_p.replace(".wav", ".srt")
-    if m_obj[1] == "habibi": # For Habibi, we don't have per-chunk timestamps yet in this simple impl
-        with open(s_p, "w", encoding="utf-8") as f: f.write(f"1\n00:00:00,000 --> {format_timestamp(len(f_aud)/sr)}\n{text}\n")
-    else:
-        with open(s_p, "w", encoding="utf-8") as f: f.write(srt_content)
-        
+    with open(s_p, "w", encoding="utf-8") as f: f.write(srt_content)
+    
     z_p = w_p.replace(".wav", ".zip")
     with zipfile.ZipFile(z_p, 'w') as z:
         z.write(f_p, os.path.basename(f_p))
         z.write(s_p, os.path.basename(s_p))
-    return (sr, f_aud), f_p, s_p, z_p
+    memory_checkpoint(mem, "export")
+    if mem: memory_report(mem)
+    yield (sr, f_aud), f_p, s_p, z_p, None
 
 # --- UI LOGIC ---
 # Fixed typo in ui_lang (d vs t)
@@ -584,11 +984,13 @@ def ui_lang_fixed(l):
         gr.update(label=d["habibi_ref_wav_label"]),
         gr.update(label=d["habibi_ref_txt_label"], placeholder=d["habibi_ref_txt_placeholder"]),
         gr.update(label=d["kokoro_lang_label"]),
-        gr.update(label=d["kokoro_voice_label"])
+        gr.update(label=d["kokoro_voice_label"]),
+        gr.update(label=d["live_preview"])
     ]
 
 theme = gr.themes.Soft(primary_hue="teal", neutral_hue="slate")
-with gr.Blocks(title="Dolphin KURDISH TTS", theme=theme) as demo:
+# delete_cache keeps Gradio's temp copies of outputs from piling up on long-running servers
+with gr.Blocks(title="Dolphin KURDISH TTS", theme=theme, delete_cache=(3600, 86400)) as demo:
     with gr.Row():
         tit = gr.Markdown("# 🐬 Dolphin KURDISH TTS")
         ls = gr.Radio(["Kurdish", "English", "Arabic"], value="English", label="Language / زمان / اللغة")
@@ -623,6 +1025,8 @@ with gr.Blocks(title="Dolphin KURDISH TTS", theme=theme) as demo:
                         mp3 = gr.Checkbox(label="Export as MP3", value=False)
                     btn = gr.Button("🔊 Generate Speech", variant="primary")
                 with gr.Column():
+                    # Habibi streams each chunk here as soon as it is vocoded
+                    a_live = gr.Audio(label="Live Preview (Habibi)", streaming=True, autoplay=True, visible=False)
                     a_p = gr.Audio(label="Audio Preview")
                     a_f = gr.File(label="Audio File")
                     s_f = gr.File(label="Subtitles (.srt)")
@@ -646,7 +1050,8 @@ with gr.Blocks(title="Dolphin KURDISH TTS", theme=theme) as demo:
     def update_visibility(d):
         return [
             gr.update(visible=(d == "Arabic (Habibi - Dialectal)")),
-            gr.update(visible=(d == "Multi-Language (Kokoro-82M)"))
+            gr.update(visible=(d == "Multi-Language (Kokoro-82M)")),
+            gr.update(visible=(d == "Arabic (Habibi - Dialectal)"))
         ]
 
     def update_kokoro_voices(lang_name):
@@ -654,12 +1059,16 @@ with gr.Blocks(title="Dolphin KURDISH TTS", theme=theme) as demo:
         voices = KOKORO_VOICES[lang_code]
         return gr.update(choices=voices, value=voices[0])
 
-    dia.change(update_visibility, [dia], [arb_dialect_params, kokoro_params])
+    dia.change(update_visibility, [dia], [arb_dialect_params, kokoro_params, a_live])
     k_lang.change(update_kokoro_voices, [k_lang], [k_voice])
 
-    ls.change(ui_lang_fixed, [ls], [tit, dia, upl, lm, txt, a1, ps, pl, a2, sp, pt, mp3, btn, a_p, a_f, s_f, z_f, c1, c2, raw, cbtn, cout, ut, m1, m2, m3, m4, ft, t1, t2, t3, h_dia, a3, h_wav, h_txt, k_lang, k_voice])
-    upl.change(lambda f: open(f.name, encoding='utf-8', errors='ignore').read() if f else "", [upl], [txt])
-    btn.click(generate_audio_engine, [txt, dia, sp, pt, mp3, ps, pl, h_dia, h_wav, h_txt, k_lang, k_voice], [a_p, a_f, s_f, z_f])
+    ls.change(ui_lang_fixed, [ls], [tit, dia, upl, lm, txt, a1, ps, pl, a2, sp, pt, mp3, btn, a_p, a_f, s_f, z_f, c1, c2, raw, cbtn, cout, ut, m1, m2, m3, m4, ft, t1, t2, t3, h_dia, a3, h_wav, h_txt, k_lang, k_voice, a_live])
+    def read_upload(path):
+        if not path: return ""
+        with open(path, encoding='utf-8', errors='ignore') as f: return f.read()
+
+    upl.change(read_upload, [upl], [txt])
+    btn.click(generate_audio_engine, [txt, dia, sp, pt, mp3, ps, pl, h_dia, h_wav, h_txt, k_lang, k_voice], [a_p, a_f, s_f, z_f, a_live])
     cbtn.click(normalize_kurdish_text, [raw], [cout])
 
 if __name__ == "__main__":
@@ -669,4 +1078,6 @@ if __name__ == "__main__":
         pyi_splash.close()
     except:
         pass
+    apply_runtime_profile(runtime_profile)
+    demo.queue(default_concurrency_limit=runtime_profile["concurrency"])
     demo.launch(inbrowser=True)
\ No newline at end of file
@@ -0,0 +1,117 @@
+import os
+import sys
+import json
+import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import app
+
+CONCURRENCY_CANDIDATES = [1, 2, 4]
+INTEROP_CANDIDATES = [1, 2]
+TRIAL_MARKER = "AUTOTUNE_RESULT "
+# Only the VITS models go through the staged pipeline the profile tunes
+VITS_DIALECTS = [d for d in app.MODELS if d not in ("Arabic (Habibi - Dialectal)", "Multi-Language (Kokoro-82M)")]
+
+def installed_vits_dialect():
+    """First VITS dialect found in local_models or the Hugging Face cache, so tuning doesn't trigger a download."""
+    for dialect in VITS_DIALECTS:
+        manual_path = os.path.join(app.LOCAL_OVERRIDE_DIR, "".join([c if c.isalnum() else "_" for c in dialect]))
+        cached_path = os.path.join(app.MODEL_CACHE_DIR, "models--" + app.MODELS[dialect].replace("/", "--"))
+        if (os.path.isdir(manual_path) and os.listdir(manual_path)) or os.path.isdir(cached_path):
+            return dialect
+    return None
+
+def candidate_profiles(cores):
+    """Every (concurrency, torch threads, interop threads) combination that fits in the core count."""
+    profiles = []
+    for concurrency in [c for c in CONCURRENCY_CANDIDATES if c <= cores]:
+        budget = max(1, cores // concurrency)
+        for threads in sorted({budget, max(1, budget // 2)}):
+            for interop in INTEROP_CANDIDATES:
+                profiles.append({"torch_threads": threads, "interop_threads": interop, "concurrency": concurrency})
+    return profiles
+
+def run_trial(profile, dialect, text):
+    """
+    Runs inside a fresh process, because interop threads can only be set once per process.
+    Synthesizes text from `concurrency` threads at once. Chunk length is not swept: on the VITS
+    path vits_frontend re-splits every chunk into phrases, so it only moves the long pauses.
+    """
+    app.apply_runtime_profile(dict(app.runtime_profile, **profile))
+    model, tok = app.load_voice_model(dialect)
+    if model is None: raise RuntimeError(f"{dialect} model unavailable: {tok}")
+    sr = model.config.sampling_rate
+    stages = app.vits_stages(model, tok, sr, 1.0, 0)
+
+    chunks = app.split_into_chunks(text)
+
+    def synthesize(_):
+        start = time.perf_counter()
+        for _ in app.run_stage_pipeline(app.vits_frontend(chunks, 0.4, 1.3), stages): pass
+        return time.perf_counter() - start
+
+    synthesize(None) # Warm-up
+    with ThreadPoolExecutor(max_workers=profile["concurrency"]) as pool:
+        start = time.perf_counter()
+        latencies = list(pool.map(synthesize, range(profile["concurrency"])))
+        wall = time.perf_counter() - start
+    return dict(profile, chars_per_s=len(text) * profile["concurrency"] / wall, latency_s=max(latencies))
+
+def autotune(dialect=None):
+    print("============================================")
+    print("   🐬 Dolphin TTS - Runtime Autotuner")
+    print("============================================")
+    if dialect is None:
+        dialect = installed_vits_dialect()
+        if dialect is None:
+            dialect = VITS_DIALECTS[0]
+            print(f"No VITS model found locally; '{dialect}' will be downloaded by the first trial.")
+    elif dialect not in VITS_DIALECTS:
+        print(f"❌ '{dialect}' cannot be tuned: the autotuner measures the VITS pipeline. Choose one of: {', '.join(VITS_DIALECTS)}")
+        return None
+    cores = os.cpu_count() or 1
+    print(f"Host: {cores} logical cores. Tuning against the '{dialect}' model.")
+    print("--------------------------------------------")
+
+    results = []
+    for profile in candidate_profiles(cores):
+        label = f"{profile['concurrency']} req x {profile['torch_threads']} threads (interop {profile['interop_threads']})"
+        print(f"\n⏳ Trying {label}...")
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--trial", json.dumps(profile), dialect],
+            capture_output=True, text=True, encoding="utf-8",
+            # app.py prints emoji at import; a piped stdout on Windows would otherwise be cp1252 and crash the trial
+            env={**os.environ, "PYTHONIOENCODING": "utf-8"}
+        )
+        lines = [l for l in proc.stdout.splitlines() if l.startswith(TRIAL_MARKER)]
+        if proc.returncode != 0 or not lines:
+            print(f"   ⚠️ Trial failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+            continue
+        r = json.loads(lines[-1][len(TRIAL_MARKER):])
+        print(f"   {r['chars_per_s']:8.1f} chars/s, slowest request {r['latency_s']:.2f} s")
+        results.append(r)
+
+    if not results:
+        print("\n❌ No trial succeeded; keeping the library defaults.")
+        return None
+
+    best = max(results, key=lambda r: r["chars_per_s"])
+    profile = {k: best[k] for k in ("torch_threads", "interop_threads", "concurrency")}
+    app.save_runtime_profile(profile)
+    print("\n============================================")
+    print(f"🎉 Best: {best['chars_per_s']:.1f} chars/s with {profile}")
+    print(f"Saved to {app.RUNTIME_PROFILE_PATH}. It is applied the next time you run: python app.py")
+    print("============================================")
+    return profile
+
+def sample_text():
+    with open(os.path.join(app.BASE_DIR, "examples", "sorani_sample.txt"), encoding="utf-8") as f:
+        return app.normalize_kurdish_text(" ".join([f.read().strip()] * 6))
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--trial":
+        dialect = sys.argv[3] if len(sys.argv) > 3 else "Sorani"
+        print(TRIAL_MARKER + json.dumps(run_trial(json.loads(sys.argv[2]), dialect, sample_text())))
+    else:
+        sys.exit(0 if autotune(*sys.argv[1:2]) else 1)
@@ -0,0 +1,179 @@
+import os
+import sys
+import time
+import threading
+
+# Importing app sets up the cache directories and builds (but does not launch) the UI
+import app
+import psutil
+
+# Mixed sentence lengths, like real prose, so batch planning has something to reorder
+HABIBI_BENCH_TEXT = " ".join([
+    app.HABIBI_DEFAULT_REF_TXT,
+    "وصل الفريق مساءً.",
+    "استقبلت الجماهير اللاعبين في المطار بالأعلام والأغاني، وامتدت الاحتفالات حتى ساعات متأخرة من الليل في شوارع المدينة وساحاتها الرئيسية.",
+    "لم يتوقع أحد ذلك.",
+    "قال المدرب في المؤتمر الصحفي إن الفوز جاء ثمرة عمل طويل، وإن اللاعبين الشباب أثبتوا أنهم قادرون على المنافسة أمام أقوى المنتخبات، مضيفًا أن الطريق ما زال طويلًا.",
+    "ثم عاد الهدوء.",
+] * 4)
+KOKORO_BENCH_TEXT = "\n".join([
+    " ".join([
+        "The dolphin surfaced beside the boat, curious and unafraid.",
+        "Its breath hissed through the blowhole like a kettle coming to the boil.",
+        "Nobody on deck said a word; they simply watched it circle twice and dive again.",
+    ] * 6)
+] * 8)
+
+def measure(fn, *args, **kwargs):
+    """
+    Runs fn once and returns (seconds, peak RSS in MB).
+    RSS is sampled on a background thread because torch allocations are invisible to tracemalloc.
+    """
+    proc = psutil.Process(os.getpid())
+    peak = [proc.memory_info().rss]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.05):
+            peak[0] = max(peak[0], proc.memory_info().rss)
+
+    watcher = threading.Thread(target=sample, daemon=True)
+    watcher.start()
+    start = time.perf_counter()
+    try:
+        fn(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        done.set()
+        watcher.join()
+    return elapsed, peak[0] / (1024 * 1024)
+
+def report(name, result):
+    elapsed, peak_mb = result
+    print(f"   {name:<32} {elapsed:8.2f} s   peak RSS {peak_mb:8.1f} MB")
+
+def report_arrivals(name, arrivals, reference=None):
+    """Seconds until each chunk reached the caller (the live preview); with a reference, which chunks came later and by how much."""
+    line = f"   {name:<32} first {arrivals[0]:6.2f} s   median {sorted(arrivals)[len(arrivals)//2]:6.2f} s   last {arrivals[-1]:6.2f} s"
+    if reference:
+        late = [a - r for a, r in zip(arrivals, reference) if a > r]
+        line += f"   held back {len(late)}/{len(arrivals)}" + (f" (worst +{max(late):.2f} s)" if late else "")
+    print(line)
+
+def bench_habibi(text=HABIBI_BENCH_TEXT, dialect="MSA"):
+    from f5_tts.infer.utils_infer import preprocess_ref_audio_text
+    from habibi_tts.infer.utils_infer import infer_process
+    from habibi_tts.model.utils import dialect_id_map
+
+    model, status = app.load_habibi_model()
+    if model is None:
+        print(f"   ❌ Habibi model unavailable: {status}")
+        return
+    vocoder = app.load_habibi_vocoder()
+    ref_wav, ref_txt = app.resolve_habibi_reference(dialect)
+    ref_file, ref_txt = preprocess_ref_audio_text(ref_wav, ref_txt)
+    dialect_id = dialect_id_map.get(dialect[:3], None)
+
+    print(f"\n📦 Habibi ({dialect}) - {len(text)} characters")
+
+    def single_call():
+        infer_process(ref_file, ref_txt, text, model, vocoder, dialect_id=dialect_id)
+
+    arrivals = {}
+    def chunked(window_batches):
+        start = time.perf_counter()
+        ref = app.prepare_habibi_reference(ref_file, ref_txt)
+        budget = app.habibi_chunk_chars(ref, 1.0)
+        chunks = app.cut_long_chunks(app.split_into_chunks(text, max_chars=budget), budget)
+        arrivals[window_batches] = []
+        for _ in app.stream_habibi_chunks(chunks, model, vocoder, ref, 1.0, dialect_id, window_batches=window_batches):
+            arrivals[window_batches].append(time.perf_counter() - start)
+
+    # Warm-up so neither path pays for lazy CUDA/kernel initialisation
+    infer_process(ref_file, ref_txt, app.HABIBI_DEFAULT_REF_TXT, model, vocoder, dialect_id=dialect_id)
+    report("single infer_process call", measure(single_call))
+    report("chunked, consecutive batches", measure(chunked, 1))
+    report("chunked, length-planned batches", measure(chunked, app.PLAN_WINDOW_BATCHES))
+    print("   Live preview: when each chunk arrived")
+    report_arrivals("consecutive batches", arrivals[1])
+    report_arrivals("length-planned batches", arrivals[app.PLAN_WINDOW_BATCHES], arrivals[1])
+
+def bench_kokoro(text=KOKORO_BENCH_TEXT, lang_code="a", voice="af_bella"):
+    pipeline, status = app.load_kokoro_model(lang_code)
+    if pipeline is None:
+        print(f"   ❌ Kokoro pipeline unavailable: {status}")
+        return
+
+    print(f"\n📦 Kokoro ({lang_code}/{voice}) - {len(text)} characters")
+
+    def newline_split():
+        for _ in pipeline(text, voice=voice, split_pattern=r'\n+'): pass
+
+    def sentence_pipelined():
+        for _ in app.stream_kokoro_segments(pipeline, app.split_kokoro_segments(text), voice, 1.0): pass
+
+    for _ in pipeline("Warm up.", voice=voice): pass
+    report("split on newlines (KPipeline)", measure(newline_split))
+    report("sentences + G2P lookahead", measure(sentence_pipelined))
+
+def bench_vits(text=None, dialect="Sorani", speed=1.2, pitch=2):
+    if text is None:
+        with open(os.path.join(app.BASE_DIR, "examples", "sorani_sample.txt"), encoding="utf-8") as f:
+            text = " ".join([f.read().strip()] * 10)
+    model, tok = app.load_voice_model(dialect)
+    if model is None:
+        print(f"   ❌ {dialect} model unavailable: {tok}")
+        return
+    text = app.normalize_kurdish_text(text)
+    sr = model.config.sampling_rate
+    chunks = app.split_into_chunks(text)
+    stages = app.vits_stages(model, tok, sr, speed, pitch)
+
+    print(f"\n📦 VITS ({dialect}, speed {speed}, pitch {pitch}) - {len(text)} characters")
+
+    def sequential():
+        for item in app.vits_frontend(chunks, 0.4, 1.3):
+            for fn in stages:
+                item = fn(item)
+                if item is None: break
+
+    def staged():
+        for _ in app.run_stage_pipeline(app.vits_frontend(chunks, 0.4, 1.3), stages): pass
+
+    sequential()
+    report("sequential (one thread)", measure(sequential))
+    report("staged pipeline", measure(staged))
+
+def bench_plan(text=HABIBI_BENCH_TEXT, max_chars=150):
+    """
+    Model-free: padding waste of consecutive vs length-planned Habibi buckets.
+    Habibi is the only engine that batches; `benchmark.py habibi` times it and when each chunk reaches the preview.
+    """
+    chunks = app.cut_long_chunks(app.split_into_chunks(text, max_chars=max_chars), max_chars)
+    lengths = [len(c) for c in chunks]
+    print(f"\n📦 Synthesis planner - Habibi batch {app.HABIBI_BATCH_SIZE}, {len(chunks)} chunks of {min(lengths)}-{max(lengths)} chars")
+    for label, window in (("consecutive", 1), ("length-planned", app.PLAN_WINDOW_BATCHES)):
+        plan, buckets = app.plan_synthesis(chunks, app.HABIBI_BATCH_SIZE, window, estimate=lambda t: len(t.encode("utf-8")))
+        print(f"   {label:<16} padding {app.plan_padding(plan, buckets):6.1%}")
+
+BENCHMARKS = {
+    "habibi": bench_habibi,
+    "kokoro": bench_kokoro,
+    "vits": bench_vits,
+    "plan": bench_plan,
+}
+
+if __name__ == "__main__":
+    print("============================================")
+    print("   🐬 Dolphin TTS - Engine Benchmarks")
+    print("============================================")
+    names = sys.argv[1:2] or list(BENCHMARKS)
+    text_file = sys.argv[2] if len(sys.argv) > 2 else None
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}'. Choose from: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        if text_file:
+            with open(text_file, encoding="utf-8") as f: BENCHMARKS[name](f.read())
+        else:
+            BENCHMARKS[name]()
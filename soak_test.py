@@ -0,0 +1,205 @@
+import os
+import sys
+import gc
+import types
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+import soundfile as sf
+import torch
+
+import app
+
+METRICS = ("rss_mb", "cuda_mb", "traced_mb")
+KURDISH_TEXT = "سڵاو، ئەمە تاقیکردنەوەیەکی درێژخایەنە. دەنگەکە دووبارە دەبێتەوە؟ بەڵێ! " * 8
+ARABIC_TEXT = " ".join([app.HABIBI_DEFAULT_REF_TXT] * 4)
+ENGLISH_TEXT = "The soak test keeps talking. It repeats itself on purpose; memory should stay flat.\n" * 4
+
+# --- STUB MODELS (exercise the real engine code without downloading anything) ---
+class _Output:
+    def __init__(self, **kw): self.__dict__.update(kw)
+
+class StubVits:
+    config = _Output(sampling_rate=16000)
+    def __call__(self, input_ids, **_):
+        return _Output(waveform=torch.randn(1, input_ids.shape[-1] * 400) * 0.1)
+
+def stub_tokenizer(text, return_tensors="pt"):
+    return {"input_ids": torch.ones(1, len(text), dtype=torch.long)}
+
+class StubKokoro:
+    lang_code = "x" # Non-English path: g2p returns phonemes directly
+    model = _Output(device="cpu")
+    def g2p(self, segment): return segment, None
+    def load_voice(self, voice): return torch.zeros(510, 1, 256)
+    def infer(self, model, ps, pack, speed):
+        return _Output(audio=torch.randn(len(ps) * 300) * 0.1)
+
+class StubDiT:
+    def sample(self, cond, text, duration, **_):
+        return torch.randn(len(text), int(duration.max()), 100), None
+
+class StubVocoder:
+    def decode(self, mel): return torch.randn(1, mel.shape[-1] * 256) * 0.1
+
+def install_stubs(workdir):
+    """Swaps model loading for stubs and registers the few habibi/f5 names the Habibi branch imports."""
+    def module(name, **attrs):
+        mod = types.ModuleType(name); mod.__dict__.update(attrs); sys.modules[name] = mod
+
+    module("f5_tts"); module("f5_tts.infer")
+    module("f5_tts.infer.utils_infer", preprocess_ref_audio_text=lambda wav, txt: (wav, txt), load_vocoder=StubVocoder)
+    module("habibi_tts"); module("habibi_tts.infer"); module("habibi_tts.model")
+    module("habibi_tts.infer.utils_infer", target_sample_rate=24000, target_rms=0.1, device="cpu",
+        hop_length=256, nfe_step=32, cfg_strength=2.0, sway_sampling_coef=-1.0)
+    module("habibi_tts.model.utils", dialect_id_map={d: d for d in app.HABIBI_DIALECTS},
+        text_list_formatter=lambda texts, dialect_id=None: list(texts))
+
+    vits, kokoro, dit = StubVits(), StubKokoro(), StubDiT()
+    def load_voice_model(dialect_name, kokoro_lang_code='a'):
+        if dialect_name == "Arabic (Habibi - Dialectal)": return dit, "habibi"
+        if dialect_name == "Multi-Language (Kokoro-82M)": return kokoro, "kokoro"
+        return vits, stub_tokenizer
+    app.load_voice_model = load_voice_model
+
+    ref_wav = os.path.join(workdir, "stub_ref.wav")
+    sf.write(ref_wav, np.random.randn(24000 * 3).astype(np.float32) * 0.1, 24000)
+    return ref_wav
+
+def soak_cases(ref_wav=None):
+    """One engine call per dialect / Habibi dialect / Kokoro language, as (label, args, kwargs)."""
+    cases = []
+    for dialect in app.MODELS:
+        if dialect == "Arabic (Habibi - Dialectal)":
+            for h in app.HABIBI_DIALECTS:
+                kw = {"habibi_dialect": h, "habibi_ref_wav": ref_wav, "habibi_ref_txt": app.HABIBI_DEFAULT_REF_TXT if ref_wav else ""}
+                cases.append((f"Habibi/{h}", (ARABIC_TEXT, dialect, 1.0, 0, False, 0.4, 1.3), kw))
+        elif dialect == "Multi-Language (Kokoro-82M)":
+            for lang, code in app.KOKORO_LANGS.items():
+                kw = {"kokoro_lang": lang, "kokoro_voice": app.KOKORO_VOICES[code][0]}
+                cases.append((f"Kokoro/{code}", (ENGLISH_TEXT, dialect, 1.0, 0, False, 0.4, 1.3), kw))
+        else:
+            # Alternate speed/pitch so the librosa DSP stage is exercised too
+            cases.append((dialect, (KURDISH_TEXT, dialect, 1.0, 0, False, 0.4, 1.3), {}))
+            cases.append((f"{dialect} (speed/pitch)", (KURDISH_TEXT, dialect, 1.2, 2, False, 0.4, 1.3), {}))
+    return cases
+
+def run_case(args, kwargs):
+    # The engine is a generator (Habibi streams live chunks first); the last item holds the files
+    *_, result = app.generate_audio_engine(*args, **kwargs)
+    # Remove the outputs (and the .wav behind an .mp3) so the soak test measures memory, not disk
+    paths = [p for p in result[1:4] if p]
+    if paths: paths.append(os.path.splitext(paths[0])[0] + ".wav")
+    for path in paths:
+        if os.path.exists(path): os.remove(path)
+
+def stage_retention(records):
+    """
+    Attributes memory still held after each request returned (and gc.collect() ran) to the stage that
+    allocated it. A stage is credited only with growth that no later checkpoint gives back, i.e. the rise
+    in the running minimum over the remaining checkpoints, so memory that one stage allocates and a later
+    one frees counts for neither. Memory that drops below the request's start is reported as "released",
+    so per request the rows add up to its returned - start growth.
+    """
+    totals = {}
+    for rec in records:
+        stages = [stage for stage, _ in rec["stages"]]
+        for k in METRICS:
+            values = [snap[k] for _, snap in rec["stages"]]
+            if None in values: continue
+            floor = values[:]
+            for i in range(len(floor) - 2, -1, -1): floor[i] = min(floor[i], floor[i + 1])
+            for stage, prev, cur in zip(stages[1:], floor, floor[1:]):
+                totals.setdefault(stage, dict.fromkeys(METRICS, 0.0))[k] += cur - prev
+            totals.setdefault("released", dict.fromkeys(METRICS, 0.0))[k] += floor[0] - values[0]
+    return totals
+
+def soak(iterations, warmup, threshold_mb, stub):
+    print("============================================")
+    print("   🐬 Dolphin TTS - Memory Soak Test")
+    print("============================================")
+    workdir = tempfile.mkdtemp(prefix="dolphin_soak_")
+    ref_wav = install_stubs(workdir) if stub else None
+    cases = soak_cases(ref_wav)
+    print(f"Mode: {'stub' if stub else 'real'} models, {len(cases)} cases x {iterations} iterations ({warmup} warm-up)")
+    print(f"Fail threshold: {threshold_mb:.1f} MB RSS growth after warm-up")
+    print("--------------------------------------------")
+
+    app.MEMORY_TRACE = True
+    # Every checkpoint runs gc.collect(); freezing the import-time heap (gradio, transformers) keeps that cheap
+    gc.collect()
+    gc.freeze()
+    tracemalloc.start()
+    base, census, case_growth, records = None, None, {}, []
+    outside = dict.fromkeys(METRICS, 0.0)
+
+    def drift(since, until):
+        # Growth between two snapshots that no request accounts for (between requests, iteration bookkeeping)
+        for k in outside:
+            if since[k] is not None and until[k] is not None: outside[k] += until[k] - since[k]
+
+    for it in range(iterations):
+        if it == warmup:
+            # The heap census allocates as it walks, so it runs before the baseline RSS is read, not during the run
+            census = app.memory_census()
+            gc.collect()
+            base = prev_end = app.memory_snapshot()
+        for label, args, kwargs in cases:
+            try:
+                run_case(args, kwargs)
+            except Exception as e:
+                print(f"   ❌ {label}: {e}")
+                return False
+            if it >= warmup:
+                # Closing checkpoint once the outputs are gone, so only what outlives the request is attributed
+                rec = app.memory_log[-1]
+                app.memory_checkpoint(rec, "returned")
+                start, end = rec["stages"][0][1], rec["stages"][-1][1]
+                case_growth[label] = case_growth.get(label, 0.0) + end["rss_mb"] - start["rss_mb"]
+                drift(prev_end, start)
+                prev_end = end
+                records.append(rec)
+            app.memory_log.clear()
+        gc.collect()
+        snap = app.memory_snapshot()
+        tag = "warm-up" if it < warmup else "measure"
+        print(f"   Iteration {it+1:>3} ({tag}): RSS {snap['rss_mb']:8.1f} MB, traced {snap['traced_mb']:8.1f} MB")
+
+    final = app.memory_snapshot()
+    drift(prev_end, final)
+    growth = final["rss_mb"] - base["rss_mb"]
+    # Only now, with the verdict's RSS already read, is the second census allowed to allocate
+    census = {k: v - census[k] for k, v in app.memory_census().items()}
+    tracemalloc.stop()
+
+    shown = [k for k in METRICS if base[k] is not None] # No CUDA column on CPU-only hosts
+    def row(name, t):
+        print(f"   {name:<18}" + "".join(f"   {k[:-3].upper() if k != 'traced_mb' else 'traced'} {t[k]:+8.1f} MB" for k in shown))
+
+    print("\n📊 Retained after warm-up, by engine stage (sum over measured requests):")
+    for stage, t in stage_retention(records).items(): row(stage, t)
+    row("between requests", outside)
+    row("total", {k: final[k] - base[k] for k in shown})
+    print("\n📊 RSS growth by case:")
+    for label, g in sorted(case_growth.items(), key=lambda kv: -kv[1])[:10]:
+        print(f"   {label:<40} {g:+8.1f} MB")
+    print(f"   {'(between requests)':<40} {outside['rss_mb']:+8.1f} MB")
+    print(f"\n   Heap census since warm-up: torch {census['torch_mb']:+.1f} MB, numpy {census['numpy_mb']:+.1f} MB")
+
+    passed = growth <= threshold_mb
+    print("\n============================================")
+    print(f"{'✅ PASS' if passed else '❌ FAIL'}: RSS grew {growth:+.1f} MB after warm-up (limit {threshold_mb:.1f} MB)")
+    print("============================================")
+    return passed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive generate_audio_engine repeatedly and fail on memory growth.")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--threshold-mb", type=float, default=50.0)
+    parser.add_argument("--stub", action="store_true", help="Use stub models instead of the installed ones")
+    opts = parser.parse_args()
+    if opts.warmup >= opts.iterations: parser.error("--iterations must be larger than --warmup")
+    sys.exit(0 if soak(opts.iterations, opts.warmup, opts.threshold_mb, opts.stub) else 1)